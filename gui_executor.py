@@ -7,47 +7,132 @@ Features modern UI styling with platform-specific themes.
 
 import sys
 import pickle
+import socket
+import struct
 import tkinter as tk
 from tkinter import ttk
+from tkinter import font as tkfont
 import platform
 import os
+from functools import lru_cache
+from types import MappingProxyType
+from typing import Any, List, Optional, Tuple
+
+import msgspec
 
 CURRENT_PLATFORM = platform.system().lower()
 IS_WINDOWS = CURRENT_PLATFORM == 'windows'
 IS_MACOS = CURRENT_PLATFORM == 'darwin'
 IS_LINUX = CURRENT_PLATFORM == 'linux'
 
+# IPC framing shared with human_loop_server.py: a 4-byte big-endian length, then the payload
+FRAME_HEADER = struct.Struct("!I")
+# Larger lengths can only come from a corrupted stream
+MAX_FRAME_SIZE = 64 * 1024 * 1024
+# Pickle payloads are only used when explicitly requested for compatibility
+LEGACY_IPC = os.environ.get("FASTMCP_LEGACY_IPC") == "1"
+
+class DialogRequest(msgspec.Struct, array_like=True):
+    """Dialog request sent by the server, encoded as [dialog_type, [args...]]"""
+    dialog_type: str
+    args: Tuple[Any, ...]
+
+class DialogResponse(msgspec.Struct):
+    """Dialog result returned to the server"""
+    result: Any = None
+    error: Optional[str] = None
+
+def read_frame(stream, message_type):
+    """Read one length-prefixed frame from a binary stream, or None at end of stream"""
+    header = stream.read(FRAME_HEADER.size)
+    if not header:
+        return None
+    if len(header) < FRAME_HEADER.size:
+        raise EOFError("Truncated frame header")
+    (length,) = FRAME_HEADER.unpack(header)
+    if length > MAX_FRAME_SIZE:
+        raise EOFError(f"Corrupt frame header ({length} bytes)")
+    payload = stream.read(length)
+    if len(payload) != length:
+        raise EOFError(f"Truncated frame: got {len(payload)} of {length} bytes")
+    if LEGACY_IPC:
+        return msgspec.convert(pickle.loads(payload), message_type)
+    return msgspec.msgpack.decode(payload, type=message_type)
+
+def write_frame(stream, message):
+    """Write one length-prefixed frame to a binary stream"""
+    if LEGACY_IPC:
+        payload = pickle.dumps(msgspec.to_builtins(message))
+    else:
+        payload = msgspec.msgpack.encode(message)
+    stream.write(FRAME_HEADER.pack(len(payload)) + payload)
+    stream.flush()
+
+class SocketStream:
+    """Binary stream over the IPC socket that reads into a reusable buffer"""
+
+    def __init__(self, sock, buffer_size=64 * 1024):
+        self.sock = sock
+        self.buffer = bytearray(buffer_size)
+
+    def read(self, size):
+        """Read exactly size bytes (fewer only at EOF) as a view into the buffer"""
+        if size > len(self.buffer):
+            self.buffer = bytearray(size)
+        view = memoryview(self.buffer)
+        received = 0
+        while received < size:
+            count = self.sock.recv_into(view[received:size])
+            if count == 0:
+                break
+            received += count
+        return view[:received]
+
+    def write(self, data):
+        self.sock.sendall(data)
+
+    def flush(self):
+        pass
+
+def named_font(family, size, weight="normal"):
+    """Create a named Tk font that widgets share instead of each parsing a font tuple"""
+    return tkfont.Font(root=shared_root(), family=family, size=size, weight=weight)
+
+@lru_cache(maxsize=1)
 def get_system_font():
     """Get appropriate system font for the current platform"""
     if IS_MACOS:
-        return ("SF Pro Display", 13)
+        return named_font("SF Pro Display", 13)
     elif IS_WINDOWS:
-        return ("Segoe UI", 10)
+        return named_font("Segoe UI", 10)
     else:
-        return ("Ubuntu", 10)
+        return named_font("Ubuntu", 10)
 
+@lru_cache(maxsize=1)
 def get_title_font():
     """Get title font for dialogs"""
     if IS_MACOS:
-        return ("SF Pro Display", 16, "bold")
+        return named_font("SF Pro Display", 16, "bold")
     elif IS_WINDOWS:
-        return ("Segoe UI", 14, "bold")
+        return named_font("Segoe UI", 14, "bold")
     else:
-        return ("Ubuntu", 14, "bold")
+        return named_font("Ubuntu", 14, "bold")
 
+@lru_cache(maxsize=1)
 def get_text_font():
     """Get text font for text widgets"""
     if IS_MACOS:
-        return ("Monaco", 12)
+        return named_font("Monaco", 12)
     elif IS_WINDOWS:
-        return ("Consolas", 11)
+        return named_font("Consolas", 11)
     else:
-        return ("Ubuntu Mono", 10)
+        return named_font("Ubuntu Mono", 10)
 
+@lru_cache(maxsize=1)
 def get_theme_colors():
-    """Get modern theme colors based on platform"""
+    """Get modern theme colors based on platform (shared, read-only)"""
     if IS_WINDOWS:
-        return {
+        return MappingProxyType({
             "bg_primary": "#FFFFFF",
             "bg_secondary": "#F8F9FA",
             "bg_accent": "#F1F3F4",
@@ -60,9 +145,9 @@ def get_theme_colors():
             "error_color": "#D93025",
             "selection_bg": "#E3F2FD",
             "selection_fg": "#1565C0"
-        }
+        })
     elif IS_MACOS:
-        return {
+        return MappingProxyType({
             "bg_primary": "#FFFFFF",
             "bg_secondary": "#F5F5F7",
             "bg_accent": "#F2F2F7",
@@ -75,9 +160,9 @@ def get_theme_colors():
             "error_color": "#FF3B30",
             "selection_bg": "#E3F2FD",
             "selection_fg": "#1565C0"
-        }
+        })
     else:  # Linux
-        return {
+        return MappingProxyType({
             "bg_primary": "#FFFFFF",
             "bg_secondary": "#F8F9FA",
             "bg_accent": "#F1F3F4",
@@ -90,7 +175,7 @@ def get_theme_colors():
             "error_color": "#D32F2F",
             "selection_bg": "#E3F2FD",
             "selection_fg": "#1565C0"
-        }
+        })
 
 def create_modern_button(parent, text, command, button_type="primary", theme_colors=None):
     """Create a modern styled button with hover effects and guaranteed visibility"""
@@ -239,30 +324,14 @@ def bring_window_to_front(window):
         if IS_MACOS:
             # macOS specific - multiple approaches for reliability
             try:
-                # Set window to topmost
+                # Set window to topmost (configure_modern_window activated the process)
                 window.attributes('-topmost', True)
                 window.lift()
                 window.focus_force()
                 
-                # Use AppleScript to activate Python and bring to front
-                import subprocess
-                
-                # First, activate Python application
-                subprocess.run([
-                    'osascript', '-e',
-                    f'tell application "System Events" to set frontmost of first process whose unix id is {os.getpid()} to true'
-                ], check=False, capture_output=True, timeout=0.5)
-                
-                # Also try to activate by name (backup method)
-                subprocess.run([
-                    'osascript', '-e',
-                    'tell application "Python" to activate'
-                ], check=False, capture_output=True, timeout=0.5)
-                
-                # Play system sound to alert user
-                subprocess.run(['afplay', '/System/Library/Sounds/Glass.aiff'], 
-                             check=False, capture_output=True, timeout=0.5)
-            except:
+                # Alert the user with the system sound
+                window.bell()
+            except tk.TclError:
                 pass
                 
         elif IS_WINDOWS:
@@ -281,7 +350,7 @@ def bring_window_to_front(window):
                 user32.SetForegroundWindow(hwnd)
                 user32.ShowWindow(hwnd, 3)  # SW_MAXIMIZE = 3
                 user32.ShowWindow(hwnd, 1)  # SW_NORMAL = 1
-            except:
+            except (AttributeError, OSError):
                 pass
             
             # Fallback Tkinter methods
@@ -302,8 +371,8 @@ def bring_window_to_front(window):
                 import subprocess
                 subprocess.run(['wmctrl', '-a', window.title()], 
                              check=False, capture_output=True, timeout=0.5)
-            except:
-                pass
+            except (OSError, subprocess.SubprocessError):
+                pass  # wmctrl missing or too slow; run() has already killed a timed-out child
         
         # Universal additional measures
         window.update()
@@ -320,9 +389,67 @@ def bring_window_to_front(window):
             window.attributes('-topmost', True)
             window.lift()
             window.focus_force()
-        except:
+        except tk.TclError:
+            pass
+
+def activate_application():
+    """Make the worker the frontmost macOS application with a single osascript call"""
+    import subprocess
+    
+    try:
+        # Activate by process id, falling back to activating by name; each statement is
+        # wrapped in try so a failure of the first doesn't skip the second
+        subprocess.run([
+            'osascript',
+            '-e', 'try',
+            '-e', f'tell application "System Events" to set frontmost of first process whose unix id is {os.getpid()} to true',
+            '-e', 'end try',
+            '-e', 'try',
+            '-e', 'tell application "Python" to activate',
+            '-e', 'end try'
+        ], check=False, capture_output=True, timeout=1.0)
+    except (OSError, subprocess.SubprocessError):
+        pass
+
+_root = None
+
+def shared_root():
+    """Return the hidden Tk root every dialog attaches to, creating it on first use"""
+    global _root
+    if _root is None:
+        _root = tk.Tk()
+        _root.withdraw()
+    return _root
+
+def close_dialog(window):
+    """Destroy a dialog window along with the focus callbacks it scheduled"""
+    # Only one dialog is open at a time, so every pending callback belongs to it
+    for after_id in window.tk.splitlist(window.tk.call("after", "info")):
+        window.after_cancel(after_id)
+    window.destroy()
+
+def close_leftover_dialogs():
+    """Destroy any window a failed dialog left behind, so it doesn't outlive the request"""
+    if _root is None:
+        return
+    for window in _root.winfo_children():
+        try:
+            close_dialog(window)
+        except tk.TclError:
             pass
 
+def center_window(window, width, height):
+    """Size a dialog and center it on screen with a single geometry call"""
+    x = (window.winfo_screenwidth() // 2) - (width // 2)
+    y = (window.winfo_screenheight() // 2) - (height // 2)
+    
+    if IS_MACOS:
+        y = max(50, y - 50)
+    elif IS_WINDOWS:
+        y = max(30, y - 30)
+    
+    window.geometry(f"{width}x{height}+{x}+{y}")
+
 def configure_modern_window(window):
     """Apply modern window styling and bring to foreground"""
     theme_colors = get_theme_colors()
@@ -333,9 +460,14 @@ def configure_modern_window(window):
         if IS_WINDOWS:
             try:
                 window.attributes('-alpha', 0.98)  # Slight transparency
-            except:
+            except tk.TclError:
                 pass
         
+        if IS_MACOS:
+            # Once per dialog, right before it is shown: an idle worker never takes focus
+            # from the client, and the after(10) re-raise doesn't fork osascript again
+            activate_application()
+        
         # Aggressively bring window to foreground
         bring_window_to_front(window)
         
@@ -350,21 +482,16 @@ class ModernInputDialog:
         # Get theme colors
         self.theme_colors = get_theme_colors()
         
-        # Create root window
-        self.root = tk.Tk()
+        # Dialogs are toplevels of the worker's long-lived Tk root
+        self.root = tk.Toplevel(shared_root())
         self.root.title(title)
         self.root.resizable(False, False)
         
-        # Apply modern window styling
-        configure_modern_window(self.root)
-        
-        # Set size based on platform
+        # Set size based on platform (applied once the widgets are packed)
         if IS_WINDOWS:
-            self.root.geometry("420x280")
+            width, height = 420, 280
         else:
-            self.root.geometry("400x260")
-        
-        self.center_window()
+            width, height = 400, 260
         
         # Additional focus attempts after window is created
         self.root.after(10, lambda: bring_window_to_front(self.root))
@@ -468,23 +595,12 @@ class ModernInputDialog:
         # Focus on entry
         self.entry.focus_set()
         
-        # Run the main loop
-        self.root.mainloop()
-    
-    def center_window(self):
-        """Center the dialog window on screen"""
-        self.root.update_idletasks()
-        width = self.root.winfo_width()
-        height = self.root.winfo_height()
-        x = (self.root.winfo_screenwidth() // 2) - (width // 2)
-        y = (self.root.winfo_screenheight() // 2) - (height // 2)
+        # Size, place, style and raise the window in one layout pass
+        center_window(self.root, width, height)
+        configure_modern_window(self.root)
         
-        if IS_MACOS:
-            y = max(50, y - 50)
-        elif IS_WINDOWS:
-            y = max(30, y - 30)
-            
-        self.root.geometry(f"{width}x{height}+{x}+{y}")
+        # Run the main loop
+        self.root.wait_window()
     
     def ok_clicked(self):
         value = self.entry.get()
@@ -500,13 +616,11 @@ class ModernInputDialog:
                 self.result = None
         else:
             self.result = value if value else None
-        self.root.quit()
-        self.root.destroy()
+        close_dialog(self.root)
     
     def cancel_clicked(self):
         self.result = None
-        self.root.quit()
-        self.root.destroy()
+        close_dialog(self.root)
 
 class ModernConfirmationDialog:
     def __init__(self, title, message):
@@ -515,20 +629,16 @@ class ModernConfirmationDialog:
         # Get theme colors
         self.theme_colors = get_theme_colors()
         
-        self.root = tk.Tk()
+        # Dialogs are toplevels of the worker's long-lived Tk root
+        self.root = tk.Toplevel(shared_root())
         self.root.title(title)
         self.root.resizable(False, False)
         
-        # Apply modern window styling
-        configure_modern_window(self.root)
-        
-        # Set size based on platform
+        # Set size based on platform (applied once the widgets are packed)
         if IS_WINDOWS:
-            self.root.geometry("440x220")
+            width, height = 440, 220
         else:
-            self.root.geometry("420x200")
-        
-        self.center_window()
+            width, height = 420, 200
         
         # Additional focus attempts after window is created
         self.root.after(10, lambda: bring_window_to_front(self.root))
@@ -618,32 +728,19 @@ class ModernConfirmationDialog:
         # Focus on No button by default (safer)
         no_button.focus_set()
         
-        self.root.mainloop()
-    
-    def center_window(self):
-        """Center the dialog window on screen"""
-        self.root.update_idletasks()
-        width = self.root.winfo_width()
-        height = self.root.winfo_height()
-        x = (self.root.winfo_screenwidth() // 2) - (width // 2)
-        y = (self.root.winfo_screenheight() // 2) - (height // 2)
+        # Size, place, style and raise the window in one layout pass
+        center_window(self.root, width, height)
+        configure_modern_window(self.root)
         
-        if IS_MACOS:
-            y = max(50, y - 50)
-        elif IS_WINDOWS:
-            y = max(30, y - 30)
-            
-        self.root.geometry(f"{width}x{height}+{x}+{y}")
+        self.root.wait_window()
     
     def yes_clicked(self):
         self.result = True
-        self.root.quit()
-        self.root.destroy()
+        close_dialog(self.root)
     
     def no_clicked(self):
         self.result = False
-        self.root.quit()
-        self.root.destroy()
+        close_dialog(self.root)
 
 class ModernInfoDialog:
     def __init__(self, title, message):
@@ -652,20 +749,16 @@ class ModernInfoDialog:
         # Get theme colors
         self.theme_colors = get_theme_colors()
         
-        self.root = tk.Tk()
+        # Dialogs are toplevels of the worker's long-lived Tk root
+        self.root = tk.Toplevel(shared_root())
         self.root.title(title)
         self.root.resizable(False, False)
         
-        # Apply modern window styling
-        configure_modern_window(self.root)
-        
-        # Set size based on platform
+        # Set size based on platform (applied once the widgets are packed)
         if IS_WINDOWS:
-            self.root.geometry("420x200")
+            width, height = 420, 200
         else:
-            self.root.geometry("400x180")
-        
-        self.center_window()
+            width, height = 400, 180
         
         # Additional focus attempts after window is created
         self.root.after(10, lambda: bring_window_to_front(self.root))
@@ -734,27 +827,15 @@ class ModernInfoDialog:
         # Focus on OK button
         ok_button.focus_set()
         
-        self.root.mainloop()
-    
-    def center_window(self):
-        """Center the dialog window on screen"""
-        self.root.update_idletasks()
-        width = self.root.winfo_width()
-        height = self.root.winfo_height()
-        x = (self.root.winfo_screenwidth() // 2) - (width // 2)
-        y = (self.root.winfo_screenheight() // 2) - (height // 2)
+        # Size, place, style and raise the window in one layout pass
+        center_window(self.root, width, height)
+        configure_modern_window(self.root)
         
-        if IS_MACOS:
-            y = max(50, y - 50)
-        elif IS_WINDOWS:
-            y = max(30, y - 30)
-            
-        self.root.geometry(f"{width}x{height}+{x}+{y}")
+        self.root.wait_window()
     
     def ok_clicked(self):
         self.result = True
-        self.root.quit()
-        self.root.destroy()
+        close_dialog(self.root)
 
 class ModernChoiceDialog:
     def __init__(self, title, prompt, choices, allow_multiple=False):
@@ -763,22 +844,18 @@ class ModernChoiceDialog:
         # Get theme colors
         self.theme_colors = get_theme_colors()
         
-        self.root = tk.Tk()
+        # Dialogs are toplevels of the worker's long-lived Tk root
+        self.root = tk.Toplevel(shared_root())
         self.root.title(title)
         self.root.resizable(True, True)
         
-        # Apply modern window styling
-        configure_modern_window(self.root)
-        
-        # Set size based on platform
+        # Set size based on platform (applied once the widgets are packed)
         if IS_MACOS:
-            self.root.geometry("480x400")
+            width, height = 480, 400
         elif IS_WINDOWS:
-            self.root.geometry("500x420")
+            width, height = 500, 420
         else:
-            self.root.geometry("450x350")
-        
-        self.center_window()
+            width, height = 450, 350
         
         # Additional focus attempts after window is created
         self.root.after(10, lambda: bring_window_to_front(self.root))
@@ -829,8 +906,9 @@ class ModernChoiceDialog:
         )
         apply_modern_style(self.listbox, "listbox", self.theme_colors)
         
-        for choice in choices:
-            self.listbox.insert(tk.END, choice)
+        if choices:
+            # One Tcl call for the whole list instead of one per item
+            self.listbox.insert(tk.END, *choices)
         self.listbox.grid(row=0, column=0, sticky="nsew", padx=(0, 2))
         
         # Modern scrollbar
@@ -911,35 +989,22 @@ class ModernChoiceDialog:
         self.root.bind('<Return>', lambda e: self.ok_clicked())
         self.root.bind('<Escape>', lambda e: self.cancel_clicked())
         
-        self.root.mainloop()
-    
-    def center_window(self):
-        """Center the dialog window on screen"""
-        self.root.update_idletasks()
-        width = self.root.winfo_width()
-        height = self.root.winfo_height()
-        x = (self.root.winfo_screenwidth() // 2) - (width // 2)
-        y = (self.root.winfo_screenheight() // 2) - (height // 2)
-        
-        if IS_MACOS:
-            y = max(50, y - 50)
-        elif IS_WINDOWS:
-            y = max(30, y - 30)
+        # Size, place, style and raise the window in one layout pass
+        center_window(self.root, width, height)
+        configure_modern_window(self.root)
         
-        self.root.geometry(f"{width}x{height}+{x}+{y}")
+        self.root.wait_window()
     
     def ok_clicked(self):
         selection = self.listbox.curselection()
         if selection:
             selected_items = [self.listbox.get(i) for i in selection]
             self.result = selected_items if len(selected_items) > 1 else selected_items[0]
-        self.root.quit()
-        self.root.destroy()
+        close_dialog(self.root)
     
     def cancel_clicked(self):
         self.result = None
-        self.root.quit()
-        self.root.destroy()
+        close_dialog(self.root)
 
 class ModernMultilineDialog:
     def __init__(self, title, prompt, default_value=""):
@@ -948,22 +1013,18 @@ class ModernMultilineDialog:
         # Get theme colors
         self.theme_colors = get_theme_colors()
         
-        self.root = tk.Tk()
+        # Dialogs are toplevels of the worker's long-lived Tk root
+        self.root = tk.Toplevel(shared_root())
         self.root.title(title)
         self.root.resizable(True, True)
         
-        # Apply modern window styling
-        configure_modern_window(self.root)
-        
-        # Set size based on platform
+        # Set size based on platform (applied once the widgets are packed)
         if IS_MACOS:
-            self.root.geometry("580x480")
+            width, height = 580, 480
         elif IS_WINDOWS:
-            self.root.geometry("600x500")
+            width, height = 600, 500
         else:
-            self.root.geometry("550x450")
-        
-        self.center_window()
+            width, height = 550, 450
         
         # Additional focus attempts after window is created
         self.root.after(10, lambda: bring_window_to_front(self.root))
@@ -1081,92 +1142,117 @@ class ModernMultilineDialog:
         self.root.bind('<Control-Return>', lambda e: self.ok_clicked())
         self.root.bind('<Escape>', lambda e: self.cancel_clicked())
         
-        self.root.mainloop()
-    
-    def center_window(self):
-        """Center the dialog window on screen"""
-        self.root.update_idletasks()
-        width = self.root.winfo_width()
-        height = self.root.winfo_height()
-        x = (self.root.winfo_screenwidth() // 2) - (width // 2)
-        y = (self.root.winfo_screenheight() // 2) - (height // 2)
-        
-        if IS_MACOS:
-            y = max(50, y - 50)
-        elif IS_WINDOWS:
-            y = max(30, y - 30)
+        # Size, place, style and raise the window in one layout pass
+        center_window(self.root, width, height)
+        configure_modern_window(self.root)
         
-        self.root.geometry(f"{width}x{height}+{x}+{y}")
+        self.root.wait_window()
     
     def ok_clicked(self):
         self.result = self.text_widget.get("1.0", tk.END).strip()
-        self.root.quit()
-        self.root.destroy()
+        close_dialog(self.root)
     
     def cancel_clicked(self):
         self.result = None
-        self.root.quit()
-        self.root.destroy()
+        close_dialog(self.root)
 
-def main():
-    """Main entry point - this runs on the main thread of the subprocess"""
-    # Read parameters from stdin
-    params_data = sys.stdin.buffer.read()
-    params = pickle.loads(params_data)
-    
-    dialog_type = params["dialog_type"]
-    dialog_params = params["params"]
-    
-    result = None
+# Dialog class for each request type; a request's args are its constructor arguments
+DIALOG_TYPES = {
+    "input": ModernInputDialog,
+    "confirmation": ModernConfirmationDialog,
+    "info": ModernInfoDialog,
+    "choice": ModernChoiceDialog,
+    "multiline": ModernMultilineDialog,
+}
+
+def gui_ready():
+    """Health check ping: whether this worker can open its Tk root"""
+    try:
+        shared_root()
+    except tk.TclError:
+        return False
+    return True
+
+def execute_dialog(request):
+    """Show the requested dialog and wrap its result in a response"""
+    if request.dialog_type == "ping":
+        return DialogResponse(result=gui_ready())
+    dialog_class = DIALOG_TYPES.get(request.dialog_type)
+    if dialog_class is None:
+        return DialogResponse(error=f"Unknown dialog type: {request.dialog_type}")
     
     try:
-        # Create the appropriate dialog with modern styling
-        if dialog_type == "input":
-            dialog = ModernInputDialog(
-                dialog_params["title"], 
-                dialog_params["prompt"],
-                dialog_params.get("default_value", ""),
-                dialog_params.get("input_type", "text")
-            )
-            result = dialog.result
-            
-        elif dialog_type == "confirmation":
-            dialog = ModernConfirmationDialog(
-                dialog_params["title"],
-                dialog_params["message"]
-            )
-            result = dialog.result
-            
-        elif dialog_type == "info":
-            dialog = ModernInfoDialog(
-                dialog_params["title"],
-                dialog_params["message"]
-            )
-            result = dialog.result
-            
-        elif dialog_type == "choice":
-            dialog = ModernChoiceDialog(
-                dialog_params["title"],
-                dialog_params["prompt"],
-                dialog_params["choices"],
-                dialog_params.get("allow_multiple", False)
-            )
-            result = dialog.result
-            
-        elif dialog_type == "multiline":
-            dialog = ModernMultilineDialog(
-                dialog_params["title"],
-                dialog_params["prompt"],
-                dialog_params.get("default_value", "")
-            )
-            result = dialog.result
-            
+        return DialogResponse(result=dialog_class(*request.args).result)
     except Exception as e:
-        result = {"error": str(e)}
-    
-    # Write result to stdout
-    sys.stdout.buffer.write(pickle.dumps(result))
-    sys.stdout.flush()
+        close_leftover_dialogs()
+        return DialogResponse(error=str(e))
+
+def open_channel(argv):
+    """Return the (reader, writer) streams connecting us to the server"""
+    if "--ipc-fd" in argv:
+        fd = int(argv[argv.index("--ipc-fd") + 1])
+        stream = SocketStream(socket.socket(fileno=fd))
+        return stream, stream
+    return sys.stdin.buffer, sys.stdout.buffer
+
+def serve_batch(reader, writer):
+    """Answer one batch of requests, each as its dialog closes; False at end of stream"""
+    batch = read_frame(reader, List[DialogRequest])
+    if batch is None:
+        return False
+    # Dialogs in a batch are shown one after another; each is answered as it closes
+    for request in batch:
+        write_frame(writer, execute_dialog(request))
+    return True
+
+def serve_from_event_loop(root, fd, serve):
+    """Run Tk's event loop while idle, serving a batch whenever the channel is readable
+
+    Blocking in recv between dialogs would leave the app unresponsive to the
+    window system (macOS reports it as not responding).
+    """
+    serving = True
+    failure = None
+
+    def on_readable(fd, mask):
+        nonlocal serving, failure
+        # Unregistered while the batch runs: its dialogs spin nested event loops
+        root.deletefilehandler(fd)
+        try:
+            serving = serve()
+        except Exception as e:
+            serving, failure = False, e
+        if serving:
+            root.createfilehandler(fd, tk.READABLE, on_readable)
+
+    root.createfilehandler(fd, tk.READABLE, on_readable)
+    while serving:
+        root.tk.dooneevent()
+    if failure is not None:
+        raise failure
+
+def main():
+    """Main entry point - serves requests on the main thread until the server disconnects"""
+    reader, writer = open_channel(sys.argv)
+    root = None
+    try:
+        # Start Tcl/Tk and load the fonts now so the first dialog doesn't pay for it
+        root = shared_root()
+        get_system_font()
+        get_title_font()
+        get_text_font()
+    except tk.TclError:
+        pass  # no display yet; each dialog will report the error
+
+    def serve():
+        return serve_batch(reader, writer)
+
+    if root is not None and isinstance(reader, SocketStream):
+        # Tk file handlers are POSIX-only, which is also where the socket channel is used
+        serve_from_event_loop(root, reader.sock.fileno(), serve)
+    else:
+        while serve():
+            pass
 
 if __name__ == "__main__":
     # Ensure this runs on the main thread
@@ -7,363 +7,759 @@ Uses external subprocess execution for macOS thread safety.
 """
 
 import asyncio
+import atexit
+import contextlib
+import contextvars
+import functools
+import hashlib
+import importlib.util
 import json
 import platform
+import socket
 import subprocess
 import sys
 import os
 import pickle
+import py_compile
+import struct
+import tempfile
+import time
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Literal
-from pydantic import Field
+from types import MappingProxyType
+from typing import IO, TYPE_CHECKING, AsyncIterator, Callable, List, Mapping, Dict, Any, Optional, Literal, Set, Tuple, Union
+import msgspec
+import pydantic_core
+from pydantic import BaseModel, ConfigDict, Field, model_serializer
 from typing import Annotated
 
 # Set required environment variable for FastMCP 2.8.1+
 os.environ.setdefault('FASTMCP_LOG_LEVEL', 'INFO')
-from fastmcp import FastMCP, Context
+# Debug-level tool logs (e.g. the full choices list) are only built when debugging
+LOG_DEBUG = os.environ['FASTMCP_LOG_LEVEL'].upper() == 'DEBUG'
+
+# fastmcp is imported lazily by _get_mcp() so importing this module stays cheap
+if TYPE_CHECKING:
+    from fastmcp import FastMCP, Context
 
 # Platform detection
-CURRENT_PLATFORM = platform.system().lower()
+# Interned: every tool response carries it as the default "platform" field
+CURRENT_PLATFORM = sys.intern(platform.system().lower())
 IS_WINDOWS = CURRENT_PLATFORM == 'windows'
 IS_MACOS = CURRENT_PLATFORM == 'darwin'
 IS_LINUX = CURRENT_PLATFORM == 'linux'
 
-# Initialize the MCP server
-mcp = FastMCP("Human-in-the-Loop Server")
+# Static health_check details, computed once. platform.processor() is left out: on Linux
+# it runs `uname -p` in a subprocess, and "machine" already names the architecture.
+_PLATFORM_INFO = {
+    "system": platform.system(),
+    "release": platform.release(),
+    "version": platform.version(),
+    "machine": platform.machine()
+}
+_PYTHON_VERSION = sys.version.split()[0]
+_TOOLS_AVAILABLE = (
+    "get_user_input",
+    "get_user_choice",
+    "get_multiline_input",
+    "show_confirmation_dialog",
+    "show_info_message",
+    "get_human_loop_prompt",
+    "health_check"
+)
+
+# Intern the keys shared by every response dict so lookups hit the identity fast path
+for _key in (
+    "success", "selected_choice", "selected_choices", "allow_multiple", "cancelled",
+    "platform", "user_input", "character_count", "line_count", "acknowledged",
+    "confirmed", "response", "error", "status", "gui_available", "server_name",
+    "platform_details", "python_version", "is_windows", "is_macos", "is_linux",
+    "tools_available",
+):
+    sys.intern(_key)
+del _key
+
+# msgspec encodes plain dicts (e.g. health_check) several times faster than pydantic_core
+_JSON_ENCODER = msgspec.json.Encoder(enc_hook=str)
+
+def serialize_tool_result(data: Any) -> str:
+    """Serialize a tool's return value to JSON text for the MCP response"""
+    if isinstance(data, BaseModel):
+        return pydantic_core.to_json(data, fallback=str).decode()
+    return _JSON_ENCODER.encode(data).decode()
+
+# MCP server, built on first use by _get_mcp()
+_mcp: Optional["FastMCP"] = None
+_TOOLS: List[Callable[..., Any]] = []
+_PROMPTS: List[Callable[..., Any]] = []
+
+def _tool(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """Mark a coroutine to be registered as an MCP tool"""
+    _TOOLS.append(fn)
+    return fn
+
+def _prompt(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """Mark a coroutine to be registered as an MCP prompt"""
+    _PROMPTS.append(fn)
+    return fn
+
+def _get_mcp() -> "FastMCP":
+    """Return the MCP server, importing fastmcp and registering tools on first call"""
+    global _mcp
+    if _mcp is None:
+        from fastmcp import FastMCP, Context
+        _mcp = FastMCP(
+            "Human-in-the-Loop Server",
+            tool_serializer=serialize_tool_result,
+            lifespan=_lifespan
+        )
+        for tool in _TOOLS:
+            # Resolve the "Context" forward reference now that fastmcp is loaded
+            if "ctx" in tool.__annotations__:
+                tool.__annotations__["ctx"] = Context
+            _mcp.tool()(tool)
+        for prompt in _PROMPTS:
+            _mcp.prompt()(prompt)
+    return _mcp
+
+@contextlib.asynccontextmanager
+async def _lifespan(server: "FastMCP") -> AsyncIterator[None]:
+    """Spawn the GUI worker as the server starts, off the first tool call's critical path"""
+    if _GUI_EXECUTOR_EXISTS and probe_gui_available():
+        _gui_worker.prewarm()
+    yield
+
+def __getattr__(name: str) -> Any:
+    # Keep `human_loop_server.mcp` available (e.g. for `fastmcp run`) without an eager import
+    if name == "mcp":
+        return _get_mcp()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # Path to the GUI executor file
 GUI_EXECUTOR_PATH = Path(__file__).parent / "gui_executor.py"
+# Resolved once: the executor either ships next to the server or the install is broken
+_GUI_EXECUTOR_PATH_STR = str(GUI_EXECUTOR_PATH)
+_GUI_EXECUTOR_EXISTS = GUI_EXECUTOR_PATH.is_file()
+
+def refresh_executor_path() -> bool:
+    """Re-check whether gui_executor.py exists (e.g. after it was installed or removed)"""
+    global _GUI_EXECUTOR_EXISTS
+    _GUI_EXECUTOR_EXISTS = GUI_EXECUTOR_PATH.is_file()
+    return _GUI_EXECUTOR_EXISTS
+
+# subprocess only takes its posix_spawn fast path when the program path has a directory part
+PYTHON_EXECUTABLE = os.path.abspath(sys.executable) if sys.executable else "python3"
+
+def compiled_executor_path() -> str:
+    """Return a byte-compiled copy of gui_executor.py, so worker spawns skip the compiler
+
+    The .pyc is cached in __pycache__ next to the source, keyed by a hash of the
+    source. If it can't be written there, the source path is returned instead.
+    """
+    try:
+        source = GUI_EXECUTOR_PATH.read_bytes()
+        key = hashlib.blake2b(source, digest_size=8).hexdigest()
+        cfile = str(
+            GUI_EXECUTOR_PATH.parent / "__pycache__"
+            / f"gui_executor.{key}.{sys.implementation.cache_tag}.pyc"
+        )
+        if not os.path.isfile(cfile):
+            py_compile.compile(_GUI_EXECUTOR_PATH_STR, cfile=cfile, doraise=True)
+        return cfile
+    except (OSError, py_compile.PyCompileError):
+        return _GUI_EXECUTOR_PATH_STR
+
+# Seconds before the cached tkinter availability probe is refreshed
+GUI_PROBE_TTL = 60.0
+_gui_available = False
+_gui_probe_time = float("-inf")
+
+def probe_gui_available() -> bool:
+    """Return whether tkinter is importable, re-probing at most every GUI_PROBE_TTL seconds"""
+    global _gui_available, _gui_probe_time
+    now = time.monotonic()
+    if now - _gui_probe_time >= GUI_PROBE_TTL:
+        # find_spec locates the modules without importing them or initializing Tk.
+        # _tkinter is checked too: builds without Tk still ship the tkinter package.
+        _gui_available = "_tkinter" in sys.modules or (
+            importlib.util.find_spec("tkinter") is not None
+            and importlib.util.find_spec("_tkinter") is not None
+        )
+        _gui_probe_time = now
+    return _gui_available
+
+probe_gui_available()
+
+# IPC framing shared with gui_executor.py: a 4-byte big-endian length, then the payload
+FRAME_HEADER = struct.Struct("!I")
+# Larger lengths can only come from a corrupted stream (e.g. stray output on the pipe)
+MAX_FRAME_SIZE = 64 * 1024 * 1024
+# Pickle payloads are only used when explicitly requested for compatibility
+LEGACY_IPC = os.environ.get("FASTMCP_LEGACY_IPC") == "1"
+# Stream the GUI worker's output to our stderr instead of only reading it back after a crash
+DEBUG = os.environ.get("HITL_DEBUG") == "1"
+# Dialog requests made within this many seconds of each other share one request frame (0 disables)
+try:
+    BATCH_WINDOW = float(os.environ.get("BATCH_WINDOW_MS", "5")) / 1000
+except ValueError:
+    BATCH_WINDOW = 0.005
+
+class DialogRequest(msgspec.Struct, array_like=True):
+    """Dialog request sent to the GUI executor, encoded as [dialog_type, [args...]]"""
+    dialog_type: str
+    args: Tuple[Any, ...]
+
+class DialogResponse(msgspec.Struct):
+    """Dialog result returned by the GUI executor"""
+    result: Any = None
+    error: Optional[str] = None
+
+def encode_frame(message: Any) -> bytes:
+    """Serialize an IPC message into a length-prefixed frame"""
+    if LEGACY_IPC:
+        payload = pickle.dumps(msgspec.to_builtins(message))
+    else:
+        payload = msgspec.msgpack.encode(message)
+    return FRAME_HEADER.pack(len(payload)) + payload
+
+async def read_frame(reader: asyncio.StreamReader, message_type: type) -> Any:
+    """Read one length-prefixed frame from the worker, rejecting partial reads"""
+    try:
+        header = await reader.readexactly(FRAME_HEADER.size)
+        (length,) = FRAME_HEADER.unpack(header)
+        if length > MAX_FRAME_SIZE:
+            raise EOFError(f"GUI worker sent a corrupt frame header ({length} bytes)")
+        payload = await reader.readexactly(length)
+    except asyncio.IncompleteReadError as e:
+        raise EOFError(
+            f"GUI worker closed the connection after {len(e.partial)} of {e.expected} bytes"
+        ) from e
+    if LEGACY_IPC:
+        return msgspec.convert(pickle.loads(payload), message_type)
+    return msgspec.msgpack.decode(payload, type=message_type)
+
+class _GuiWorker:
+    """Long-lived gui_executor.py process that serves dialogs one at a time"""
+
+    def __init__(self) -> None:
+        self._process: Optional[asyncio.subprocess.Process] = None
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        # Worker stdout/stderr, only read when it dies (None in debug mode)
+        self._log: Optional[IO[bytes]] = None
+        # Requests waiting for the next batch, and the task that sends them
+        self._pending: List[Tuple[DialogRequest, "asyncio.Future[DialogResponse]"]] = []
+        self._flusher: Optional["asyncio.Task[None]"] = None
+        # Whether a batch has been sent and its dialogs are still open
+        self._busy = False
+        # Serializes spawns, so a pre-warm and the first batch can't both start a worker
+        self._starting = asyncio.Lock()
+        self._warmup: Optional["asyncio.Task[None]"] = None
+
+    async def _ensure_running(self) -> asyncio.subprocess.Process:
+        """Start the worker, or respawn it if it has exited"""
+        async with self._starting:
+            if self._process is not None and self._process.returncode is None:
+                return self._process
+            return await self._spawn()
+
+    async def _spawn(self) -> asyncio.subprocess.Process:
+        self._discard()
+        script = compiled_executor_path()
+        self._log = None if DEBUG else tempfile.TemporaryFile()
+        log_fd = os.dup(sys.stderr.fileno() if self._log is None else self._log.fileno())
+        if hasattr(socket, "AF_UNIX"):
+            # Duplex UNIX socket; the worker's stdout and stderr go to the log.
+            # The launch keeps to the conditions under which subprocess uses
+            # posix_spawn instead of fork+exec: an absolute program path, no pass_fds,
+            # preexec_fn, cwd or process_group, and no child stdio mapped onto fds 0-2.
+            # The child socket is inherited via close_fds=False, since pass_fds always
+            # forces fork+exec; close_fds=True would close the socket in the child, and
+            # before Python 3.13 (or without POSIX_SPAWN_CLOSEFROM) it also rules out
+            # posix_spawn.
+            parent_sock, child_sock = socket.socketpair()
+            child_sock.set_inheritable(True)
+            try:
+                self._process = await asyncio.create_subprocess_exec(
+                    PYTHON_EXECUTABLE, script, "--ipc-fd", str(child_sock.fileno()),
+                    stdin=subprocess.DEVNULL,
+                    stdout=log_fd,
+                    stderr=log_fd,
+                    close_fds=False
+                )
+            except BaseException:
+                parent_sock.close()
+                raise
+            finally:
+                child_sock.close()
+                os.close(log_fd)
+            self._reader, self._writer = await asyncio.open_unix_connection(sock=parent_sock)
+        else:
+            # Windows: fall back to the worker's stdin/stdout pipes
+            try:
+                self._process = await asyncio.create_subprocess_exec(
+                    PYTHON_EXECUTABLE, script,
+                    stdin=subprocess.PIPE,
+                    stdout=subprocess.PIPE,
+                    stderr=log_fd
+                )
+            finally:
+                os.close(log_fd)
+            self._reader, self._writer = self._process.stdout, self._process.stdin
+        return self._process
+
+    async def ping(self, timeout: float) -> bool:
+        """Ask the worker, spawning it if needed, whether it can open a Tk root"""
+        if self._busy:
+            # A dialog is on screen right now, which answers the question already
+            return True
+        response = await asyncio.wait_for(self.request("ping", ()), timeout)
+        return response.result is True
+
+    def prewarm(self) -> None:
+        """Start the worker in the background so the first dialog doesn't wait for it"""
+        if self._warmup is None or self._warmup.done():
+            self._warmup = asyncio.create_task(self._prewarm())
+
+    async def _prewarm(self) -> None:
+        try:
+            await self._ensure_running()
+        except OSError as e:
+            # Not fatal: the first dialog retries the spawn and reports the error
+            print(f"Error starting GUI worker: {e}", file=sys.stderr)
+
+    def _crash_output(self) -> str:
+        """Return the tail of what the worker wrote before it died"""
+        if self._log is None:
+            return ""
+        self._log.seek(0)
+        return self._log.read()[-4096:].decode(errors="replace").strip()
+
+    def _reset_log(self) -> None:
+        """Drop output from dialogs that completed, so the log only covers the current batch"""
+        if self._log is not None:
+            # The worker shares this file offset, so its next write lands at the start again
+            self._log.seek(0)
+            self._log.truncate()
+
+    def _discard(self, kill: bool = True) -> None:
+        """Drop the worker and its channel, killing it if it is still running"""
+        process, self._process = self._process, None
+        writer, self._reader, self._writer = self._writer, None, None
+        log, self._log = self._log, None
+        if log is not None:
+            log.close()
+        if writer is not None:
+            try:
+                writer.close()
+            except RuntimeError:
+                pass  # event loop already closed
+        if kill and process is not None and process.returncode is None:
+            try:
+                process.kill()
+            except (ProcessLookupError, RuntimeError):
+                pass
+
+    async def _send(self, frame: bytes) -> None:
+        self._writer.write(frame)
+        await self._writer.drain()
+
+    async def request(self, dialog_type: str, args: Tuple[Any, ...]) -> DialogResponse:
+        """Queue one dialog request and wait for the user's response"""
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((DialogRequest(dialog_type, args), future))
+        if self._flusher is None:
+            self._flusher = asyncio.create_task(self._flush())
+        return await future
+
+    async def _flush(self) -> None:
+        """Send queued requests to the worker until the queue stays empty"""
+        try:
+            while self._pending:
+                if BATCH_WINDOW > 0:
+                    # Let concurrent tool calls join this batch
+                    await asyncio.sleep(BATCH_WINDOW)
+                batch = [(request, future) for request, future in self._pending if not future.done()]
+                self._pending = []
+                if not batch:
+                    continue
+                self._busy = True
+                try:
+                    await self._run_batch(batch)
+                except Exception as e:
+                    unanswered = [future for _, future in batch if not future.done()]
+                    if unanswered:
+                        # The worker still owes replies for these; drop it so they can't
+                        # be read as the answers to later requests
+                        self._discard()
+                    for future in unanswered:
+                        future.set_exception(e)
+                finally:
+                    self._busy = False
+        except asyncio.CancelledError:
+            self._discard()
+            raise
+        finally:
+            self._flusher = None
 
-def run_gui_subprocess(dialog_type: str, params: dict) -> Any:
-    """Run a GUI dialog in a subprocess where it can use the main thread"""
+    async def _run_batch(
+        self, batch: List[Tuple[DialogRequest, "asyncio.Future[DialogResponse]"]]
+    ) -> None:
+        """Send a batch in one frame and resolve each caller as its dialog closes"""
+        frame = encode_frame([request for request, _ in batch])
+        process = await self._ensure_running()
+        try:
+            await self._send(frame)
+        except (BrokenPipeError, ConnectionResetError):
+            # The worker died before reading the batch, so it is safe to resend
+            self._discard()
+            process = await self._ensure_running()
+            await self._send(frame)
+        # The worker shows the dialogs in order and replies to each as it closes
+        for index, (_, future) in enumerate(batch):
+            reading = asyncio.ensure_future(read_frame(self._reader, DialogResponse))
+            abandoned = asyncio.ensure_future(asyncio.wait([f for _, f in batch[index:]]))
+            try:
+                await asyncio.wait((reading, abandoned), return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                abandoned.cancel()
+            if not reading.done():
+                # Every remaining caller gave up; close their dialogs so replies can't go stale
+                reading.cancel()
+                self._discard()
+                return
+            try:
+                response = reading.result()
+            except (EOFError, ConnectionResetError) as e:
+                raise self._crash_error(process, e) from e
+            if not future.done():
+                future.set_result(response)
+        self._reset_log()
+
+    def _crash_error(self, process: asyncio.subprocess.Process, e: Exception) -> RuntimeError:
+        """Discard a worker that died mid-batch and describe what happened"""
+        returncode = process.returncode
+        output = self._crash_output()
+        self._discard()
+        if "NSInternalInconsistencyException" in output:
+            return RuntimeError(
+                "macOS GUI thread error. Please ensure gui_executor.py is properly installed "
+                "and Python has accessibility permissions in System Preferences."
+            )
+        if output:
+            return RuntimeError(f"GUI worker exited unexpectedly (exit code {returncode}): {output}")
+        if IS_MACOS:
+            return RuntimeError(
+                f"GUI worker exited unexpectedly ({e}, exit code {returncode}). "
+                "Please ensure gui_executor.py is properly installed "
+                "and Python has accessibility permissions in System Preferences."
+            )
+        return RuntimeError(f"GUI worker exited unexpectedly ({e}, exit code {returncode})")
+
+    def close(self) -> None:
+        """Shut down the worker when the server exits"""
+        # End of stream is the shutdown signal: an idle worker leaves its request loop
+        # and exits cleanly once our end of the channel closes. A worker still showing
+        # a dialog has nobody left to answer, so it is killed.
+        self._discard(kill=self._busy)
+
+# Single worker per server process (keeps AppKit on one main thread on macOS)
+_gui_worker = _GuiWorker()
+atexit.register(_gui_worker.close)
+
+# Failures the dialog round trip can produce; anything else is a bug and reaches FastMCP
+_DIALOG_ERRORS = (RuntimeError, OSError, EOFError, msgspec.MsgspecError, pickle.UnpicklingError)
+
+async def run_gui_subprocess_async(dialog_type: str, *args: Any) -> Any:
+    """Run a GUI dialog in the worker subprocess, passing args to it positionally"""
     try:
         # Check if gui_executor.py exists
-        if not GUI_EXECUTOR_PATH.exists():
+        if not _GUI_EXECUTOR_EXISTS:
             raise FileNotFoundError(
                 f"GUI executor file not found at {GUI_EXECUTOR_PATH}. "
                 "Please ensure gui_executor.py is in the same directory as this server file."
             )
         
-        # Prepare the parameters
-        request = {
-            "dialog_type": dialog_type,
-            "params": params
-        }
-        
-        # Create a subprocess to run the GUI executor
-        process = subprocess.Popen(
-            [sys.executable, str(GUI_EXECUTOR_PATH)],
-            stdin=subprocess.PIPE,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE
-        )
-        
-        # Send parameters and get result
-        stdout, stderr = process.communicate(input=pickle.dumps(request))
-        
-        if process.returncode != 0:
-            if stderr:
-                error_msg = stderr.decode()
-                # Check if it's an NSException error
-                if "NSInternalInconsistencyException" in error_msg:
-                    raise RuntimeError(
-                        "macOS GUI thread error. Please ensure gui_executor.py is properly installed "
-                        "and Python has accessibility permissions in System Preferences."
-                    )
-                raise RuntimeError(f"GUI subprocess error: {error_msg}")
-            return None
-        
-        # Parse the result
-        result = pickle.loads(stdout)
+        response = await _gui_worker.request(dialog_type, args)
         
-        if isinstance(result, dict) and "error" in result:
-            raise RuntimeError(f"GUI error: {result['error']}")
+        if response.error is not None:
+            raise RuntimeError(f"GUI error: {response.error}")
         
-        return result
+        return response.result
         
     except FileNotFoundError as e:
         print(f"Error: {e}")
         raise
-    except Exception as e:
+    except _DIALOG_ERRORS as e:
         print(f"Error in GUI subprocess: {e}")
         return None
 
+# Tool response models
+
+class ToolResult(BaseModel):
+    """Fields shared by every dialog tool response"""
+    model_config = ConfigDict(frozen=True)
+
+    success: bool
+    cancelled: bool = False
+    error: Optional[str] = None
+    platform: str = CURRENT_PLATFORM
+
+    @model_serializer(mode="wrap")
+    def _serialize_set_fields(self, handler: Any) -> Dict[str, Any]:
+        # Only emit the fields a tool set, so each response keeps its documented shape
+        data = handler(self)
+        return {
+            key: value for key, value in data.items()
+            if key == "platform" or key in self.model_fields_set
+        }
+
+class InputResult(ToolResult):
+    """Response of get_user_input"""
+    user_input: Union[str, int, float, None] = None
+    input_type: Optional[str] = None
+
+class ChoiceResult(ToolResult):
+    """Response of get_user_choice"""
+    selected_choice: Union[str, List[str], None] = None
+    selected_choices: List[str] = []
+    allow_multiple: bool = False
+
+class MultilineResult(ToolResult):
+    """Response of get_multiline_input"""
+    user_input: Optional[str] = None
+    character_count: int = 0
+    line_count: int = 0
+
+class ConfirmationResult(ToolResult):
+    """Response of show_confirmation_dialog"""
+    confirmed: Optional[bool] = None
+    response: Optional[str] = None
+
+class InfoResult(ToolResult):
+    """Response of show_info_message"""
+    acknowledged: Optional[bool] = None
+
+# Pre-dialog log notifications still in flight (referenced so they aren't garbage collected)
+_pending_logs: Set["asyncio.Task[None]"] = set()
+# The current tool call's latest background log, which later messages must wait for
+_request_log: contextvars.ContextVar[Optional["asyncio.Task[None]"]] = contextvars.ContextVar(
+    "_request_log", default=None
+)
+
+async def _emit_log(ctx: Optional["Context"], level: str, message: str) -> None:
+    """Send a log message to the MCP client, if the tool was called with a context"""
+    if ctx is not None:
+        await _wait_request_log()
+        await getattr(ctx, level)(message)
+
+def _emit_log_soon(ctx: Optional["Context"], level: str, message: str) -> None:
+    """Send a log message in the background so the dialog opens without waiting on the client"""
+    if ctx is not None:
+        # The task inherits the previous _request_log, so back-to-back messages stay in order
+        task = asyncio.create_task(_emit_log(ctx, level, message))
+        _pending_logs.add(task)
+        task.add_done_callback(_log_sent)
+        _request_log.set(task)
+
+async def _wait_request_log() -> None:
+    """Wait until this tool call's background log has reached the client"""
+    task = _request_log.get()
+    if task is not None:
+        _request_log.set(None)
+        try:
+            # Shielded: a cancelled tool call must not cancel a message already being sent
+            await asyncio.shield(task)
+        except Exception:
+            pass  # reported by _log_sent
+
+def _log_sent(task: "asyncio.Task[None]") -> None:
+    """Forget a finished background log task, reporting it if the client send failed"""
+    _pending_logs.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        print(f"Error sending log message: {task.exception()}", file=sys.stderr)
+
+def _gui_tool(action: str, result_type: type, **error_fields: Any) -> Callable:
+    """Log tool failures through ctx and return them as an unsuccessful result_type"""
+    def decorator(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        async def wrapper(*args, ctx=None, **kwargs):
+            try:
+                result = await fn(*args, ctx=ctx, **kwargs)
+            except _DIALOG_ERRORS as e:
+                await _emit_log(ctx, "error", f"Error {action}: {str(e)}")
+                return result_type(success=False, error=str(e), **error_fields)
+            # Don't let the response overtake the "Requesting ..." notification
+            await _wait_request_log()
+            return result
+        return wrapper
+    return decorator
+
 # MCP Tools
 
-@mcp.tool()
+@_tool
+@_gui_tool("creating input dialog", InputResult, cancelled=False)
 async def get_user_input(
     title: Annotated[str, Field(description="Title of the input dialog window")],
     prompt: Annotated[str, Field(description="The prompt to show to the user")],
     default_value: Annotated[str, Field(description="Default value to pre-fill the input with")] = "",
     input_type: Annotated[Literal["text", "integer", "float"], Field(description="Type of input expected")] = "text",
-    ctx: Context = None
-) -> Dict[str, Any]:
+    ctx: "Context" = None
+) -> InputResult:
     """
     Create an input dialog window for the user to enter text, numbers, or other data.
     
     Opens a GUI dialog box where the user can input information that the LLM needs.
     Perfect for getting specific details, clarifications, or data from the user.
     """
-    try:
-        if ctx:
-            await ctx.info(f"Requesting user input: {prompt}")
-        
-        # Run dialog in subprocess
-        params = {
-            "title": title,
-            "prompt": prompt,
-            "default_value": default_value,
-            "input_type": input_type
-        }
-        
-        result = await asyncio.get_event_loop().run_in_executor(
-            None, run_gui_subprocess, "input", params
-        )
-        
-        if result is not None:
-            if ctx:
-                await ctx.info(f"User provided input: {result}")
-            return {
-                "success": True,
-                "user_input": result,
-                "input_type": input_type,
-                "cancelled": False,
-                "platform": CURRENT_PLATFORM
-            }
-        else:
-            if ctx:
-                await ctx.warning("User cancelled the input dialog")
-            return {
-                "success": False,
-                "user_input": None,
-                "input_type": input_type,
-                "cancelled": True,
-                "platform": CURRENT_PLATFORM
-            }
+    _emit_log_soon(ctx, "info", f"Requesting user input: {prompt}")
     
-    except Exception as e:
-        if ctx:
-            await ctx.error(f"Error creating input dialog: {str(e)}")
-        return {
-            "success": False,
-            "error": str(e),
-            "cancelled": False,
-            "platform": CURRENT_PLATFORM
-        }
+    result = await run_gui_subprocess_async("input", title, prompt, default_value, input_type)
+    
+    if result is not None:
+        await _emit_log(ctx, "info", f"User provided input: {result}")
+        return InputResult(
+            success=True,
+            user_input=result,
+            input_type=input_type,
+            cancelled=False
+        )
+    else:
+        await _emit_log(ctx, "warning", "User cancelled the input dialog")
+        return InputResult(
+            success=False,
+            user_input=None,
+            input_type=input_type,
+            cancelled=True
+        )
 
-@mcp.tool()
+@_tool
+@_gui_tool("creating choice dialog", ChoiceResult, cancelled=False)
 async def get_user_choice(
     title: Annotated[str, Field(description="Title of the choice dialog window")],
     prompt: Annotated[str, Field(description="The prompt/question to show to the user")],
     choices: Annotated[List[str], Field(description="List of choices to present to the user")],
     allow_multiple: Annotated[bool, Field(description="Whether user can select multiple choices")] = False,
-    ctx: Context = None
-) -> Dict[str, Any]:
+    ctx: "Context" = None
+) -> ChoiceResult:
     """
     Create a choice dialog window for the user to select from multiple options.
     
     Opens a GUI dialog box with a list of choices where the user can select
     one or multiple options. Perfect for getting decisions, preferences, or selections from the user.
     """
-    try:
-        if ctx:
-            await ctx.info(f"Requesting user choice: {prompt}")
-            await ctx.debug(f"Available choices: {choices}")
-        
-        params = {
-            "title": title,
-            "prompt": prompt,
-            "choices": choices,
-            "allow_multiple": allow_multiple
-        }
-        
-        result = await asyncio.get_event_loop().run_in_executor(
-            None, run_gui_subprocess, "choice", params
-        )
-        
-        if result is not None:
-            if ctx:
-                await ctx.info(f"User selected: {result}")
-            return {
-                "success": True,
-                "selected_choice": result,
-                "selected_choices": result if isinstance(result, list) else [result],
-                "allow_multiple": allow_multiple,
-                "cancelled": False,
-                "platform": CURRENT_PLATFORM
-            }
-        else:
-            if ctx:
-                await ctx.warning("User cancelled the choice dialog")
-            return {
-                "success": False,
-                "selected_choice": None,
-                "selected_choices": [],
-                "allow_multiple": allow_multiple,
-                "cancelled": True,
-                "platform": CURRENT_PLATFORM
-            }
+    _emit_log_soon(ctx, "info", f"Requesting user choice: {prompt}")
+    if LOG_DEBUG:
+        _emit_log_soon(ctx, "debug", f"Available choices: {choices}")
     
-    except Exception as e:
-        if ctx:
-            await ctx.error(f"Error creating choice dialog: {str(e)}")
-        return {
-            "success": False,
-            "error": str(e),
-            "cancelled": False,
-            "platform": CURRENT_PLATFORM
-        }
+    result = await run_gui_subprocess_async("choice", title, prompt, choices, allow_multiple)
+    
+    if result is not None:
+        await _emit_log(ctx, "info", f"User selected: {result}")
+        return ChoiceResult(
+            success=True,
+            selected_choice=result,
+            selected_choices=result if isinstance(result, list) else [result],
+            allow_multiple=allow_multiple,
+            cancelled=False
+        )
+    else:
+        await _emit_log(ctx, "warning", "User cancelled the choice dialog")
+        return ChoiceResult(
+            success=False,
+            selected_choice=None,
+            selected_choices=[],
+            allow_multiple=allow_multiple,
+            cancelled=True
+        )
 
-@mcp.tool()
+@_tool
+@_gui_tool("creating multiline input dialog", MultilineResult, cancelled=False)
 async def get_multiline_input(
     title: Annotated[str, Field(description="Title of the input dialog window")],
     prompt: Annotated[str, Field(description="The prompt to show to the user")],
     default_value: Annotated[str, Field(description="Default text to pre-fill in the text area")] = "",
-    ctx: Context = None
-) -> Dict[str, Any]:
+    ctx: "Context" = None
+) -> MultilineResult:
     """
     Create a multi-line text input dialog for the user to enter longer text content.
     
     Opens a GUI dialog box with a multi-line text area where the user can input text. 
     Perfect for getting detailed descriptions, code, or long-form content.
     """
-    try:
-        if ctx:
-            await ctx.info(f"Requesting multiline user input: {prompt}")
-        
-        params = {
-            "title": title,
-            "prompt": prompt,
-            "default_value": default_value
-        }
-        
-        result = await asyncio.get_event_loop().run_in_executor(
-            None, run_gui_subprocess, "multiline", params
-        )
-        
-        if result is not None:
-            if ctx:
-                await ctx.info(f"User provided multiline input ({len(result)} characters)")
-            return {
-                "success": True,
-                "user_input": result,
-                "character_count": len(result),
-                "line_count": len(result.split('\n')),
-                "cancelled": False,
-                "platform": CURRENT_PLATFORM
-            }
-        else:
-            if ctx:
-                await ctx.warning("User cancelled the multiline input dialog")
-            return {
-                "success": False,
-                "user_input": None,
-                "cancelled": True,
-                "platform": CURRENT_PLATFORM
-            }
+    _emit_log_soon(ctx, "info", f"Requesting multiline user input: {prompt}")
     
-    except Exception as e:
-        if ctx:
-            await ctx.error(f"Error creating multiline input dialog: {str(e)}")
-        return {
-            "success": False,
-            "error": str(e),
-            "cancelled": False,
-            "platform": CURRENT_PLATFORM
-        }
+    result = await run_gui_subprocess_async("multiline", title, prompt, default_value)
+    
+    if result is not None:
+        await _emit_log(ctx, "info", f"User provided multiline input ({len(result)} characters)")
+        return MultilineResult(
+            success=True,
+            user_input=result,
+            character_count=len(result),
+            line_count=result.count('\n') + 1 if result else 0,
+            cancelled=False
+        )
+    else:
+        await _emit_log(ctx, "warning", "User cancelled the multiline input dialog")
+        return MultilineResult(
+            success=False,
+            user_input=None,
+            cancelled=True
+        )
+
+# Confirmation response and log text, indexed by whether the user confirmed
+_YN_RESP = ("no", "yes")
+_YN_LOG = ("User confirmation result: No", "User confirmation result: Yes")
 
-@mcp.tool()
+@_tool
+@_gui_tool("showing confirmation dialog", ConfirmationResult, confirmed=False)
 async def show_confirmation_dialog(
     title: Annotated[str, Field(description="Title of the confirmation dialog")],
     message: Annotated[str, Field(description="The message to show to the user")],
-    ctx: Context = None
-) -> Dict[str, Any]:
+    ctx: "Context" = None
+) -> ConfirmationResult:
     """
     Shows a confirmation dialog with Yes/No buttons.
     
     Displays a confirmation dialog to the user.
     Perfect for getting approval or attention before proceeding with an action.
     """
-    try:
-        if ctx:
-            await ctx.info(f"Requesting user confirmation: {message}")
-        
-        params = {
-            "title": title,
-            "message": message
-        }
-        
-        result = await asyncio.get_event_loop().run_in_executor(
-            None, run_gui_subprocess, "confirmation", params
-        )
-        
-        if ctx:
-            await ctx.info(f"User confirmation result: {'Yes' if result else 'No'}")
-        
-        return {
-            "success": True,
-            "confirmed": result,
-            "response": "yes" if result else "no",
-            "platform": CURRENT_PLATFORM
-        }
+    _emit_log_soon(ctx, "info", f"Requesting user confirmation: {message}")
     
-    except Exception as e:
-        if ctx:
-            await ctx.error(f"Error showing confirmation dialog: {str(e)}")
-        return {
-            "success": False,
-            "error": str(e),
-            "confirmed": False,
-            "platform": CURRENT_PLATFORM
-        }
+    result = await run_gui_subprocess_async("confirmation", title, message)
+    
+    answer = 1 if result else 0
+    await _emit_log(ctx, "info", _YN_LOG[answer])
+    
+    return ConfirmationResult(
+        success=True,
+        confirmed=result,
+        response=_YN_RESP[answer]
+    )
 
-@mcp.tool()
+@_tool
+@_gui_tool("showing info message", InfoResult)
 async def show_info_message(
     title: Annotated[str, Field(description="Title of the information dialog")],
     message: Annotated[str, Field(description="The information message to show to the user")],
-    ctx: Context = None
-) -> Dict[str, Any]:
+    ctx: "Context" = None
+) -> InfoResult:
     """
     Show an information message to the user.
     
     The user just needs to click OK to acknowledge the message.
     """
-    try:
-        if ctx:
-            await ctx.info(f"Showing info message to user: {message}")
-        
-        params = {
-            "title": title,
-            "message": message
-        }
-        
-        result = await asyncio.get_event_loop().run_in_executor(
-            None, run_gui_subprocess, "info", params
-        )
-        
-        if ctx:
-            await ctx.info("Info message acknowledged by user")
-        
-        return {
-            "success": True,
-            "acknowledged": result,
-            "platform": CURRENT_PLATFORM
-        }
+    _emit_log_soon(ctx, "info", f"Showing info message to user: {message}")
     
-    except Exception as e:
-        if ctx:
-            await ctx.error(f"Error showing info message: {str(e)}")
-        return {
-            "success": False,
-            "error": str(e),
-            "platform": CURRENT_PLATFORM
-        }
+    result = await run_gui_subprocess_async("info", title, message)
+    
+    await _emit_log(ctx, "info", "Info message acknowledged by user")
+    
+    return InfoResult(success=True, acknowledged=result)
 
-@mcp.prompt()
-async def get_human_loop_prompt() -> Dict[str, str]:
-    """Get prompting guidance for LLMs on when and how to use human-in-the-loop tools."""
-    return {
-        "main_prompt": """
+# Prompt guidance is static, so it is built once at import
+_HUMAN_LOOP_PROMPT: Mapping[str, str] = MappingProxyType({
+    "main_prompt": """
 You have access to Human-in-the-Loop tools that allow you to interact directly with users through GUI dialogs. Use these tools strategically to enhance task completion and user experience.
 
 **WHEN TO USE HUMAN-IN-THE-LOOP TOOLS:**
@@ -390,8 +786,8 @@ You have access to Human-in-the-Loop tools that allow you to interact directly w
 - Give status updates for long-running processes
 - Offer meaningful choices rather than overwhelming options
 - Be concise but informative in dialog prompts""",
-        
-        "usage_examples": """
+    
+    "usage_examples": """
 **EXAMPLE SCENARIOS:**
 
 1. **File Operations:**
@@ -403,8 +799,8 @@ You have access to Human-in-the-Loop tools that allow you to interact directly w
    - "What tone should I use: Professional, Casual, Friendly?" (choice)
    - "Please provide any specific requirements:" (multiline input)
    - "Content generated successfully!" (info message)""",
-        
-        "decision_framework": """
+    
+    "decision_framework": """
 **DECISION FRAMEWORK FOR HUMAN-IN-THE-LOOP:**
 
 ASK YOURSELF:
@@ -413,60 +809,57 @@ ASK YOURSELF:
 3. Could this action cause problems if wrong? → USE CONFIRMATION DIALOG
 4. Is this a long process the user should know about? → USE INFO MESSAGE
 5. Do I need detailed explanation or content? → USE MULTILINE INPUT"""
-    }
+})
+
+@_prompt
+async def get_human_loop_prompt() -> Dict[str, str]:
+    """Get prompting guidance for LLMs on when and how to use human-in-the-loop tools."""
+    return dict(_HUMAN_LOOP_PROMPT)
 
-@mcp.tool()
-async def health_check() -> Dict[str, Any]:
+# health_check fields that are fixed for the life of the process; the first three
+# are placeholders so the per-call values keep their place in the output
+_STATIC_HEALTH: Dict[str, Any] = {
+    "status": "degraded",
+    "gui_available": False,
+    "gui_executor_found": False,
+    "gui_executor_path": _GUI_EXECUTOR_PATH_STR,
+    "server_name": "Human-in-the-Loop Server (External Subprocess Mode)",
+    "platform": CURRENT_PLATFORM,
+    "platform_details": _PLATFORM_INFO,
+    "python_version": _PYTHON_VERSION,
+    "is_windows": IS_WINDOWS,
+    "is_macos": IS_MACOS,
+    "is_linux": IS_LINUX,
+    "tools_available": _TOOLS_AVAILABLE,
+    "execution_mode": "external_subprocess",
+    "note": "GUI operations run in one persistent worker process, on its main thread, for thread safety"
+}
+
+# Seconds a deep health check waits for the worker (covers a cold spawn and Tk startup)
+GUI_PING_TIMEOUT = 5.0
+
+@_tool
+async def health_check(
+    deep: Annotated[bool, Field(description="Ping the GUI worker instead of using the cached tkinter check")] = False
+) -> Dict[str, Any]:
     """Check if the Human-in-the-Loop server is running and GUI is available."""
     try:
         # Check if GUI executor file exists
-        gui_executor_exists = GUI_EXECUTOR_PATH.exists()
+        gui_executor_exists = _GUI_EXECUTOR_EXISTS
         
-        # Test GUI availability
-        gui_test_success = False
-        if gui_executor_exists:
+        # Test GUI availability using the cached probe
+        gui_test_success = gui_executor_exists and probe_gui_available()
+        if deep and gui_test_success:
             try:
-                # Test if we can import tkinter in a subprocess
-                process = subprocess.Popen(
-                    [sys.executable, "-c", "import tkinter; print('OK')"],
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE
-                )
-                stdout, stderr = process.communicate(timeout=2)
-                gui_test_success = process.returncode == 0 and b'OK' in stdout
-            except:
+                gui_test_success = await _gui_worker.ping(GUI_PING_TIMEOUT)
+            except (TimeoutError, *_DIALOG_ERRORS):
                 gui_test_success = False
         
-        return {
-            "status": "healthy" if (gui_executor_exists and gui_test_success) else "degraded",
-            "gui_available": gui_test_success,
-            "gui_executor_found": gui_executor_exists,
-            "gui_executor_path": str(GUI_EXECUTOR_PATH),
-            "server_name": "Human-in-the-Loop Server (External Subprocess Mode)",
-            "platform": CURRENT_PLATFORM,
-            "platform_details": {
-                "system": platform.system(),
-                "release": platform.release(),
-                "version": platform.version(),
-                "machine": platform.machine(),
-                "processor": platform.processor()
-            },
-            "python_version": sys.version.split()[0],
-            "is_windows": IS_WINDOWS,
-            "is_macos": IS_MACOS,
-            "is_linux": IS_LINUX,
-            "tools_available": [
-                "get_user_input",
-                "get_user_choice", 
-                "get_multiline_input",
-                "show_confirmation_dialog",
-                "show_info_message",
-                "get_human_loop_prompt",
-                "health_check"
-            ],
-            "execution_mode": "external_subprocess",
-            "note": "GUI operations run in separate process files for maximum thread safety"
-        }
+        response = _STATIC_HEALTH.copy()
+        response["status"] = "healthy" if (gui_executor_exists and gui_test_success) else "degraded"
+        response["gui_available"] = gui_test_success
+        response["gui_executor_found"] = gui_executor_exists
+        return response
     except Exception as e:
         return {
             "status": "unhealthy",
@@ -476,68 +869,92 @@ async def health_check() -> Dict[str, Any]:
         }
 
 # Main execution
+def install_fast_event_loop() -> Optional[str]:
+    """Run the server on uvloop (winloop on Windows) if installed; returns the loop's name"""
+    try:
+        if IS_WINDOWS:
+            import winloop as loop_module
+        else:
+            import uvloop as loop_module
+    except ImportError:
+        return None
+    # FastMCP starts its loop through anyio, which creates it from the current policy
+    asyncio.set_event_loop_policy(loop_module.EventLoopPolicy())
+    return loop_module.__name__
+
+# Startup banner text that doesn't depend on the install, built once so main() writes it in one go
+_BANNER_HEADER = (
+    "Starting Human-in-the-Loop MCP Server (macOS External Subprocess Mode)...\n"
+    "This server provides tools for LLMs to interact with humans through GUI dialogs.\n"
+    f"Platform: {CURRENT_PLATFORM} ({_PLATFORM_INFO['system']} {_PLATFORM_INFO['release']})\n"
+    "\n"
+)
+_BANNER_TOOLS = (
+    "\nAvailable tools:\n"
+    "- get_user_input - Get text/number input from user\n"
+    "- get_user_choice - Let user choose from options\n"
+    "- get_multiline_input - Get multi-line text from user\n"
+    "- show_confirmation_dialog - Ask user for yes/no confirmation\n"
+    "- show_info_message - Display information to user\n"
+    "- get_human_loop_prompt - Get guidance on when to use human-in-the-loop tools\n"
+    "- health_check - Check server status\n"
+    "\n"
+)
+if IS_MACOS:
+    _BANNER_PLATFORM = (
+        "✓ macOS detected - Using external subprocess mode for absolute thread safety\n"
+        "✓ All GUI dialogs run in one persistent worker process, on its main thread\n"
+        "\nIMPORTANT: You may need to:\n"
+        "1. Allow Python in System Preferences > Security & Privacy > Accessibility\n"
+        "2. Ensure both human_loop_server.py and gui_executor.py are in the same directory\n"
+    )
+elif IS_WINDOWS:
+    _BANNER_PLATFORM = "Windows detected - Using external subprocess mode\n"
+elif IS_LINUX:
+    _BANNER_PLATFORM = "Linux detected - Using external subprocess mode\n"
+else:
+    _BANNER_PLATFORM = ""
+_BANNER_FOOTER = (
+    "\nStarting MCP server...\n"
+    "Ready to handle GUI requests through external subprocess execution.\n"
+    "\n"
+)
+
 def main():
-    print("Starting Human-in-the-Loop MCP Server (macOS External Subprocess Mode)...")
-    print("This server provides tools for LLMs to interact with humans through GUI dialogs.")
-    print(f"Platform: {CURRENT_PLATFORM} ({platform.system()} {platform.release()})")
-    print("")
+    banner = [_BANNER_HEADER]
     
     # Check for gui_executor.py
-    if not GUI_EXECUTOR_PATH.exists():
-        print("⚠️  WARNING: gui_executor.py not found!")
-        print(f"   Please ensure gui_executor.py is in: {GUI_EXECUTOR_PATH.parent}")
-        print("   Download it from the project repository or create it from the provided code.")
-        print("")
+    if not _GUI_EXECUTOR_EXISTS:
+        banner.append(
+            "⚠️  WARNING: gui_executor.py not found!\n"
+            f"   Please ensure gui_executor.py is in: {GUI_EXECUTOR_PATH.parent}\n"
+            "   Download it from the project repository or create it from the provided code.\n"
+            "\n"
+        )
     else:
-        print("✓ GUI executor file found")
-    
-    print("\nAvailable tools:")
-    print("- get_user_input - Get text/number input from user")
-    print("- get_user_choice - Let user choose from options")
-    print("- get_multiline_input - Get multi-line text from user")
-    print("- show_confirmation_dialog - Ask user for yes/no confirmation")
-    print("- show_info_message - Display information to user")
-    print("- get_human_loop_prompt - Get guidance on when to use human-in-the-loop tools")
-    print("- health_check - Check server status")
-    print("")
+        banner.append("✓ GUI executor file found\n")
     
-    # Platform-specific startup messages
-    if IS_MACOS:
-        print("✓ macOS detected - Using external subprocess mode for absolute thread safety")
-        print("✓ Each GUI dialog runs in a separate process with guaranteed main thread access")
-        print("\nIMPORTANT: You may need to:")
-        print("1. Allow Python in System Preferences > Security & Privacy > Accessibility")
-        print("2. Ensure both human_loop_server.py and gui_executor.py are in the same directory")
-    elif IS_WINDOWS:
-        print("Windows detected - Using external subprocess mode")
-    elif IS_LINUX:
-        print("Linux detected - Using external subprocess mode")
+    banner.append(_BANNER_TOOLS)
+    banner.append(_BANNER_PLATFORM)
     
     # Test GUI availability
-    if GUI_EXECUTOR_PATH.exists():
-        print("\nTesting GUI availability...")
-        try:
-            process = subprocess.Popen(
-                [sys.executable, "-c", "import tkinter; print('OK')"],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE
-            )
-            stdout, stderr = process.communicate(timeout=2)
-            if process.returncode == 0 and b'OK' in stdout:
-                print("✓ GUI system is available and working")
-            else:
-                print("⚠ GUI system may have issues")
-                if stderr:
-                    print(f"  Error: {stderr.decode()[:200]}")
-        except Exception as e:
-            print(f"⚠ Could not verify GUI availability: {e}")
+    if _GUI_EXECUTOR_EXISTS:
+        banner.append("\nTesting GUI availability...\n")
+        if probe_gui_available():
+            banner.append("✓ GUI system is available and working\n")
+        else:
+            banner.append("⚠ GUI system may have issues\n  Error: tkinter module not found\n")
+    
+    event_loop = install_fast_event_loop()
+    if event_loop:
+        banner.append(f"\n✓ Using the {event_loop} event loop\n")
     
-    print("\nStarting MCP server...")
-    print("Ready to handle GUI requests through external subprocess execution.")
-    print("")
+    banner.append(_BANNER_FOOTER)
+    sys.stdout.write("".join(banner))
+    sys.stdout.flush()
     
     # Run the server
-    mcp.run()
+    _get_mcp().run()
 
 if __name__ == "__main__":
     main()
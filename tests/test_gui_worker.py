@@ -0,0 +1,83 @@
+"""Tests for the persistent GUI worker channel
+
+Unknown dialog types are answered without opening a window, so these run without a display.
+"""
+
+import asyncio
+import os
+import subprocess
+import sys
+
+import msgspec
+import pytest
+import pytest_asyncio
+
+import human_loop_server
+
+
+@pytest_asyncio.fixture
+async def worker():
+    gui_worker = human_loop_server._GuiWorker()
+    yield gui_worker
+    process = gui_worker._process
+    gui_worker._discard()
+    if process is not None:
+        await process.wait()
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_does_not_leak_replies(worker, monkeypatch):
+    """A batch that fails part-way must not leave stale replies for later requests"""
+    read_frame = human_loop_server.read_frame
+    calls = 0
+
+    async def fail_first_reply(reader, message_type):
+        nonlocal calls
+        calls += 1
+        response = await read_frame(reader, message_type)
+        if calls == 1:
+            raise msgspec.ValidationError("bad reply")
+        return response
+
+    monkeypatch.setattr(human_loop_server, "BATCH_WINDOW", 0.05)
+    monkeypatch.setattr(human_loop_server, "read_frame", fail_first_reply)
+
+    results = await asyncio.gather(
+        worker.request("bogusA", ()),
+        worker.request("bogusB", ()),
+        return_exceptions=True
+    )
+    assert all(isinstance(result, msgspec.ValidationError) for result in results)
+
+    response = await worker.request("bogusC", ())
+    assert response.error == "Unknown dialog type: bogusC"
+
+
+@pytest.mark.asyncio
+async def test_unknown_dialog_type_is_reported(worker):
+    response = await worker.request("bogus", ())
+    assert response.result is None
+    assert response.error == "Unknown dialog type: bogus"
+
+
+@pytest.mark.asyncio
+async def test_large_result_round_trip(worker):
+    """Replies well past the old shared memory threshold come back intact, inline"""
+    shm_before = set(os.listdir("/dev/shm")) if os.path.isdir("/dev/shm") else set()
+    dialog_type = "x" * (1024 * 1024)
+
+    response = await worker.request(dialog_type, ())
+
+    assert response.error == f"Unknown dialog type: {dialog_type}"
+    if os.path.isdir("/dev/shm"):
+        assert set(os.listdir("/dev/shm")) == shm_before
+
+
+def test_invalid_batch_window_falls_back_to_default():
+    env = dict(os.environ, BATCH_WINDOW_MS="fast")
+    output = subprocess.run(
+        [sys.executable, "-c", "import human_loop_server; print(human_loop_server.BATCH_WINDOW)"],
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        env=env, capture_output=True, text=True, check=True
+    ).stdout
+    assert output.split()[-1] == "0.005"
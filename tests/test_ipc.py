@@ -0,0 +1,48 @@
+"""Tests for the length-prefixed frames exchanged with the GUI worker"""
+
+import asyncio
+import io
+
+import pytest
+
+import gui_executor
+import human_loop_server
+from human_loop_server import DialogRequest, DialogResponse, FRAME_HEADER, encode_frame
+
+
+def stream_reader(data):
+    reader = asyncio.StreamReader()
+    reader.feed_data(data)
+    reader.feed_eof()
+    return reader
+
+
+@pytest.mark.asyncio
+async def test_frame_round_trip():
+    request = DialogRequest("input", ("t", "p", "", "text"))
+    frame = encode_frame([request])
+    assert await human_loop_server.read_frame(stream_reader(frame), list[DialogRequest]) == [request]
+
+
+@pytest.mark.asyncio
+async def test_server_rejects_oversized_frame():
+    reader = stream_reader(FRAME_HEADER.pack(0xFFFFFFFF))
+    with pytest.raises(EOFError):
+        await human_loop_server.read_frame(reader, DialogResponse)
+
+
+@pytest.mark.asyncio
+async def test_server_rejects_truncated_frame():
+    frame = encode_frame(DialogResponse(result="hello"))
+    with pytest.raises(EOFError):
+        await human_loop_server.read_frame(stream_reader(frame[:-1]), DialogResponse)
+
+
+def test_worker_rejects_oversized_frame():
+    stream = io.BytesIO(FRAME_HEADER.pack(0xFFFFFFFF))
+    with pytest.raises(EOFError):
+        gui_executor.read_frame(stream, gui_executor.DialogResponse)
+
+
+def test_worker_reads_none_at_end_of_stream():
+    assert gui_executor.read_frame(io.BytesIO(), gui_executor.DialogResponse) is None
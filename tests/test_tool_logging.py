@@ -0,0 +1,70 @@
+"""Tests for the order of the log notifications a tool sends through its context"""
+
+import asyncio
+
+import pytest
+
+import human_loop_server
+
+
+class SlowContext:
+    """Records log messages; "info" takes a while, like a slow client connection"""
+
+    def __init__(self):
+        self.messages = []
+
+    async def info(self, message):
+        await asyncio.sleep(0.05)
+        self.messages.append(("info", message))
+
+    async def warning(self, message):
+        self.messages.append(("warning", message))
+
+    async def error(self, message):
+        self.messages.append(("error", message))
+
+
+@pytest.mark.asyncio
+async def test_error_log_follows_request_log(monkeypatch):
+    monkeypatch.setattr(human_loop_server, "_GUI_EXECUTOR_EXISTS", False)
+    ctx = SlowContext()
+
+    result = await human_loop_server.get_multiline_input("t", "p", ctx=ctx)
+
+    assert result.success is False
+    assert [level for level, _ in ctx.messages] == ["info", "error"]
+    assert ctx.messages[0] == ("info", "Requesting multiline user input: p")
+
+
+@pytest.mark.asyncio
+async def test_cancel_log_follows_request_log(monkeypatch):
+    async def cancelled(*args):
+        return None
+
+    monkeypatch.setattr(human_loop_server, "run_gui_subprocess_async", cancelled)
+    ctx = SlowContext()
+
+    result = await human_loop_server.get_user_input("t", "p", ctx=ctx)
+
+    assert result.cancelled is True
+    assert ctx.messages == [
+        ("info", "Requesting user input: p"),
+        ("warning", "User cancelled the input dialog"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_request_log_is_sent_before_the_tool_returns(monkeypatch):
+    async def confirmed(*args):
+        return True
+
+    monkeypatch.setattr(human_loop_server, "run_gui_subprocess_async", confirmed)
+    ctx = SlowContext()
+
+    result = await human_loop_server.show_confirmation_dialog("t", "m", ctx=ctx)
+
+    assert result.confirmed is True
+    assert ctx.messages == [
+        ("info", "Requesting user confirmation: m"),
+        ("info", "User confirmation result: Yes"),
+    ]
@@ -0,0 +1,84 @@
+"""Tests for the response shape of each dialog tool on success, cancel and error"""
+
+import json
+
+import pytest
+
+import human_loop_server
+from human_loop_server import serialize_tool_result
+
+
+TOOL_CALLS = {
+    "get_user_input": (human_loop_server.get_user_input, ("t", "p")),
+    "get_user_choice": (human_loop_server.get_user_choice, ("t", "p", ["a", "b"])),
+    "get_multiline_input": (human_loop_server.get_multiline_input, ("t", "p")),
+    "show_confirmation_dialog": (human_loop_server.show_confirmation_dialog, ("t", "m")),
+    "show_info_message": (human_loop_server.show_info_message, ("t", "m")),
+}
+
+
+async def call_tool(monkeypatch, tool, dialog_result=None, dialog_error=None):
+    """Run a tool against a stubbed dialog round trip and decode its serialized response"""
+    async def run_dialog(*args):
+        if dialog_error is not None:
+            raise dialog_error
+        return dialog_result
+
+    monkeypatch.setattr(human_loop_server, "run_gui_subprocess_async", run_dialog)
+    fn, args = TOOL_CALLS[tool]
+    return json.loads(serialize_tool_result(await fn(*args)))
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("tool, dialog_result, expected", [
+    ("get_user_input", "hello", {
+        "success": True, "user_input": "hello", "input_type": "text", "cancelled": False,
+    }),
+    ("get_user_choice", "a", {
+        "success": True, "selected_choice": "a", "selected_choices": ["a"],
+        "allow_multiple": False, "cancelled": False,
+    }),
+    ("get_multiline_input", "one\ntwo", {
+        "success": True, "user_input": "one\ntwo", "character_count": 7, "line_count": 2,
+        "cancelled": False,
+    }),
+    ("show_confirmation_dialog", True, {"success": True, "confirmed": True, "response": "yes"}),
+    ("show_info_message", True, {"success": True, "acknowledged": True}),
+])
+async def test_success_response(monkeypatch, tool, dialog_result, expected):
+    response = await call_tool(monkeypatch, tool, dialog_result=dialog_result)
+    assert response == {**expected, "platform": human_loop_server.CURRENT_PLATFORM}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("tool, expected", [
+    ("get_user_input", {
+        "success": False, "user_input": None, "input_type": "text", "cancelled": True,
+    }),
+    ("get_user_choice", {
+        "success": False, "selected_choice": None, "selected_choices": [],
+        "allow_multiple": False, "cancelled": True,
+    }),
+    ("get_multiline_input", {"success": False, "user_input": None, "cancelled": True}),
+    ("show_confirmation_dialog", {"success": True, "confirmed": None, "response": "no"}),
+    ("show_info_message", {"success": True, "acknowledged": None}),
+])
+async def test_cancel_response(monkeypatch, tool, expected):
+    response = await call_tool(monkeypatch, tool)
+    assert response == {**expected, "platform": human_loop_server.CURRENT_PLATFORM}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("tool, extra", [
+    ("get_user_input", {"cancelled": False}),
+    ("get_user_choice", {"cancelled": False}),
+    ("get_multiline_input", {"cancelled": False}),
+    ("show_confirmation_dialog", {"confirmed": False}),
+    ("show_info_message", {}),
+])
+async def test_error_response(monkeypatch, tool, extra):
+    response = await call_tool(monkeypatch, tool, dialog_error=RuntimeError("boom"))
+    assert response == {
+        "success": False, "error": "boom", **extra,
+        "platform": human_loop_server.CURRENT_PLATFORM,
+    }